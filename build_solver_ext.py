@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2025 Alex PB <chozabu@gmail.com>
+#
+# This file is part of SixCells.
+"""
+Ahead-of-time compile the solver and grid kernels into the `sixcells_solver_ext` extension module.
+
+The generator imports the extension if it is present, so it doesn't have to
+JIT-compile the kernels on startup; otherwise it falls back to kernels.py.
+Requires Numba and a C compiler. Rebuild after changing kernels.py.
+"""
+
+import os.path
+
+from numba.pycc import CC
+
+import kernels
+
+
+def main():
+    cc = CC('sixcells_solver_ext')
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    for name, signature in kernels.SIGNATURES.items():
+        cc.export(name, signature)(getattr(kernels, name).py_func)
+    cc.compile()
+
+
+if __name__ == '__main__':
+    main()
@@ -9,16 +9,46 @@ Hexcells Level Generator for SixCells
 Generates procedural Hexcells levels with automatic clue minimization
 """
 
+import contextlib
+import multiprocessing
 import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import List, Tuple, Optional
 
+import numpy as np
+
 import common
 from common import *
-from solver import *
+try:
+    from solver import *
+except ImportError:
+    solve = None
+from kernels import EMPTY, FULL, UNKNOWN, GRID_EMPTY, GRID_BLACK, GRID_BLUE, GRID_HINT
+try:
+    # Ahead-of-time compiled kernels, see build_solver_ext.py
+    from sixcells_solver_ext import member_bits, propagate_simple, prune_clues, black_cell_grouping
+except ImportError:
+    from kernels import member_bits, propagate_simple, prune_clues, black_cell_grouping
+
+# 2-character level format strings, keyed by (is_blue, revealed, info_type)
+_CELL_STRINGS = {
+    (is_blue, revealed, info_type): (('X' if is_blue else 'O') if revealed else ('x' if is_blue else 'o')) + info_type
+    for is_blue in (False, True) for revealed in (False, True) for info_type in '.+cn'
+}
+
+# 2-character level format strings, keyed by (direction, consecutive)
+_HINT_STRINGS = {
+    (direction, consecutive): direction + (consecutive or '+')
+    for direction in '\\|/' for consecutive in (None, 'c', 'n')
+}
 
 
 class HexCell:
     """Represents a single hexagonal cell"""
+    __slots__ = ('x', 'y', 'is_blue', 'revealed', 'info_type')
+    _is_hex = True  # cheaper than isinstance() in grid scans
+
     def __init__(self, x, y, is_blue=False, info_type='+'):
         self.x = x
         self.y = y
@@ -28,37 +58,36 @@ class HexCell:
         
     def to_string(self):
         """Convert to 2-character level format"""
-        if self.is_blue:
-            cell_char = 'X' if self.revealed else 'x'
-        else:
-            cell_char = 'O' if self.revealed else 'o'
-        return cell_char + self.info_type
+        return _CELL_STRINGS[self.is_blue, self.revealed, self.info_type]
+
+
+# Direction deltas: (dx, dy) for moving in a column hint's direction,
+# indexed by the direction's position in _DIR_IDX
+_DIR_IDX = {'\\': 0, '|': 1, '/': 2}
+_DIR_DELTAS = (
+    (1, 1),  # diagonal down-right
+    (0, 2),  # straight down
+    (-1, 1),  # diagonal down-left
+)
+direction_deltas = dict(zip(_DIR_IDX, _DIR_DELTAS))
+_COLUMN_ANGLES = (-60, 0, 60)  # Column.angle of each direction
 
 
 class ColumnHint:
     """Represents a column/line hint"""
+    __slots__ = ('x', 'y', 'direction', '_dir_idx', 'consecutive')
+    _is_hex = False
+
     def __init__(self, x, y, direction, consecutive=None):
         self.x = x
         self.y = y
         self.direction = direction  # '\\', '|', '/'
+        self._dir_idx = _DIR_IDX[direction]
         self.consecutive = consecutive  # None, 'c', or 'n'
         
     def to_string(self):
         """Convert to 2-character level format"""
-        info = '+'
-        if self.consecutive == 'c':
-            info = 'c'
-        elif self.consecutive == 'n':
-            info = 'n'
-        return self.direction + info
-
-
-# Direction deltas: (dx, dy) for moving in a column hint's direction
-direction_deltas = {
-    '\\': (1, 1),  # diagonal down-right
-    '|': (0, 2),  # straight down
-    '/': (-1, 1)  # diagonal down-left
-}
+        return _HINT_STRINGS[self.direction, self.consecutive]
 
 #============================== from player.py
 
@@ -72,23 +101,27 @@ class Cell(common.Cell):
         self._display = Cell.unknown
 
     def upd(self, first=False):
+        scene = self.scene()
+        if scene is not None and scene._batch:
+            scene._dirty_cells.append(self)
+            return
         common.Cell.upd(self, first)
         if self.guess:
             self.setBrush(Color.blue_border if self.guess == Cell.full else Color.black_border)
 
+    @event_property
+    def guess(self):
+        if self.placed:
+            self.scene()._guess[self.id] = _state_of.get(self.guess, UNKNOWN)
+
     @setter_property
     def display(self, value):
-        rem = 0
-        try:
-            if self.display is not Cell.full and value is Cell.full:
-                rem = -1
-            if self.display is Cell.full and value is not Cell.full:
-                rem = 1
-        except AttributeError:
-            pass
         yield value
-        if rem and self.placed:
-            self.scene().remaining += rem
+        if self.placed:
+            scene = self.scene()
+            state = _state_of[value]
+            scene.remaining += int(_remaining_delta[scene._display[self.id], state])
+            scene._display[self.id] = state
         self.guess = None
         self.flower = False
         self.extra_text = ''
@@ -102,10 +135,24 @@ class Column(common.Column):
         pass
 
 
+# Mapping between cell kinds and their integer states in the solver arrays
+_state_of = {Cell.empty: EMPTY, Cell.full: FULL, Cell.unknown: UNKNOWN}
+_kind_of = {state: kind for kind, state in _state_of.items()}
+
+# Change in the number of remaining blue cells when a cell's display goes from state [row] to [column]
+_remaining_delta = np.array([
+    # EMPTY FULL UNKNOWN
+    [0, -1, 0],  # EMPTY
+    [1, 0, 1],   # FULL
+    [0, -1, 0],  # UNKNOWN
+], np.int8)
+
 
 
 
 class Scene(common.Scene):
+    headless = False  # don't pump the Qt event loop or redraw cells while solving
+    _batch = False
 
     def __init__(self):
         common.Scene.__init__(self)
@@ -118,36 +165,105 @@ class Scene(common.Scene):
         self.solving = 0
 
         self.undo_history = []
+
+        self.all_cells = []
+        self.all_columns = []
+        self._cells_dirty = True
+
+        # Cells and columns added by GeneratedLevel.populate_scene, by position.
+        # Unlike `grid`, it still has the columns taken off the scene while clues are minimized
+        self.placed_items = {}
         
     def prepare(self):
+        self._ensure_lists()
+        # Cell ids double as indices into `all_cells` and the solver arrays
         remaining = 0
-        for i, cell in enumerate(self.all(Cell)):
+        for i, cell in enumerate(self.all_cells):
             cell.id = i
             if cell.kind is Cell.full and not cell.revealed:
                 remaining += 1
             cell._display = cell.kind if cell.revealed else Cell.unknown
-        for i, col in enumerate(self.all(Column)):
+        for i, col in enumerate(self.all_columns):
             col.id = i
         self.remaining = remaining
         self.mistakes = 0
 
-        self.full_upd()
+        if not self.headless:
+            self.full_upd()
+        self._build_solver_arrays()
+
+    def _build_solver_arrays(self):
+        """Materialize the cell states and constraints as arrays for the compiled solver kernels"""
+        cells = self.all_cells
+        self._kind = np.array([_state_of[cell.kind] for cell in cells], np.int8)
+        self._display = np.array([_state_of[cell.display] for cell in cells], np.int8)
+        self._guess = np.array([_state_of.get(cell.guess, UNKNOWN) for cell in cells], np.int8)
+
+        # Flower and neighbour cell ids of every cell, -1 where there is no cell
+        ids = {cell.coord: cell.id for cell in cells}
+        self._flower = np.array([
+            [ids.get((x + dx, y + dy), -1) for dx, dy in common._flower_deltas]
+            for x, y in (cell.coord for cell in cells)
+        ], np.int32).reshape(len(cells), len(common._flower_deltas))
+        self._nbr = self._flower[:, ::3]  # as common._neighbors_deltas
+
+        # Constraints in the same order as `solve_simple` visits them
+        informative = [cell for cell in cells if cell.show_info]
+        columns = self.all_columns
+        width = max([len(common._flower_deltas)] + [len(col.members) for col in columns])
+        con_members = np.full((len(informative) + len(columns), width), -1, np.int32)
+        for i, cell in enumerate(informative):
+            members = self._flower[cell.id] if cell.kind is Cell.full else self._nbr[cell.id]
+            con_members[i, :len(members)] = members
+        for i, col in enumerate(columns, len(informative)):
+            con_members[i, :len(col.members)] = [x.id for x in col.members]
+        self._con_owner = np.full(len(con_members), -1, np.int32)
+        self._con_owner[:len(informative)] = [cell.id for cell in informative]
+        self._con_value = np.count_nonzero((con_members >= 0) & (self._kind[con_members] == FULL), axis=1).astype(np.int32)
+        self._con_bits = member_bits(con_members, len(cells))
+
+    @contextlib.contextmanager
+    def batch_updates(self):
+        """Defer cell redraws until the end of the block, then redraw each changed cell once"""
+        self._batch = True
+        self._dirty_cells = []
+        try:
+            yield
+        finally:
+            self._batch = False
+            if not self.headless:
+                for cell in dict.fromkeys(self._dirty_cells):
+                    cell.upd()
+            self._dirty_cells = []
+
+    def _ensure_lists(self):
+        """Rebuild `all_cells` and `all_columns` if items were added or removed since last time"""
+        if self._cells_dirty:
+            self.all_cells = list(self.all(Cell))
+            self.all_columns = list(self.all(Column))
+            self._cells_dirty = False
 
+    def reset_cache(self):
+        self._cells_dirty = True
 
-    @cached_property
-    def all_cells(self):
-        return list(self.all(Cell))
+    def full_upd(self):
+        self._ensure_lists()
+        for cell in self.all_cells:
+            cell.upd(False)
+        for col in self.all_columns:
+            col.upd()
 
-    @cached_property
-    def all_columns(self):
-        return list(self.all(Column))
+    def addItem(self, item):
+        common.Scene.addItem(self, item)
+        self.reset_cache()
 
-    def reset_cache(self):
-        for attr in ['all_cells', 'all_columns']:
-            try:
-                delattr(self, attr)
-            except AttributeError:
-                pass
+    def removeItem(self, item):
+        common.Scene.removeItem(self, item)
+        self.reset_cache()
+
+    def clear(self):
+        common.Scene.clear(self)
+        self.reset_cache()
 
     def solve_step(self):
         """Derive everything that can be concluded from the current state.
@@ -156,9 +272,11 @@ class Scene(common.Scene):
             print("already solving")
             return
 
+        self._ensure_lists()
         self.confirm_guesses()
         self.solving += 1
-        app.processEvents()
+        if not self.headless:
+            app.processEvents()
         progress = False
         undo_step = []
         for cell, value in solve(self):
@@ -172,46 +290,62 @@ class Scene(common.Scene):
 
         return progress
 
-    def solve_complete(self):
-        """Continue solving until stuck.
-        Return whether the entire level could be uncovered."""
+    def solve_complete(self, trace=None):
+        """Continue solving until stuck, or until all blue cells are found.
+        Return whether the entire level could be uncovered.
+        If `trace` is a list, the display array at the start of every round is appended to it."""
+        self._ensure_lists()
         self.solving = 1
-        while self.solving:
-            self.confirm_guesses()
-
-            progress = True
-            while progress:
-                progress = False
-                for cell, value in solve_simple(self):
-                    progress = True
-                    assert cell.kind is value
-                    cell.display = cell.kind
-                    cell.upd()
-            self.solving -= 1
-            if not self.solve_step():
-                break
-            self.solving += 1
+        with self.batch_updates():
+            while self.solving:
+                self.confirm_guesses()
+                if trace is not None:
+                    trace.append(self._display.copy())
+
+                display = self._display.copy()
+                if propagate_simple(display, self._con_owner, self._con_bits, self._con_value):
+                    for i in np.flatnonzero(display != self._display):
+                        cell = self.all_cells[i]
+                        assert cell.kind is _kind_of[display[i]]
+                        cell.display = cell.kind
+                        cell.upd()
+                if self.remaining == 0:
+                    # All blue cells found, the rest can't change the outcome
+                    break
+                self.solving -= 1
+                if not self.solve_step():
+                    break
+                self.solving += 1
 
         self.solving = 0
         # If it identified all blue cells, it'll have the rest uncovered as well
         return self.remaining == 0
 
+    def uncover(self, display):
+        """Uncover every cell that is known in a display array, e.g. one recorded by solve_complete"""
+        with self.batch_updates():
+            for i in np.flatnonzero((display != UNKNOWN) & (self._display == UNKNOWN)):
+                cell = self.all_cells[i]
+                cell.display = cell.kind
+                cell.upd()
+
     def clear_guesses(self):
-        for cell in self.all(Cell):
+        self._ensure_lists()
+        for cell in self.all_cells:
             if cell.guess:
                 cell.guess = None
                 cell.upd()
 
     def confirm_guesses(self, opposite=False):
+        guessed = (self._guess != UNKNOWN) & (self._display == UNKNOWN)
+        match = (self._guess == self._kind) ^ opposite
+        self.mistakes += int(np.count_nonzero(guessed & ~match))
         correct = []
-        for cell in self.all(Cell):
-            if cell.guess and cell.display is Cell.unknown:
-                if (cell.kind == cell.guess) ^ opposite:
-                    cell.display = cell.kind
-                    cell.upd()
-                    correct.append(cell)
-                else:
-                    self.mistakes += 1
+        for i in np.flatnonzero(guessed & match):
+            cell = self.all_cells[i]
+            cell.display = cell.kind
+            cell.upd()
+            correct.append(cell)
         self.undo_history.append(correct)
 
 
@@ -219,48 +353,42 @@ class Scene(common.Scene):
 #============================
 
 
+def _lines_table():
+    lines = {}
+    for direction, (dx, dy) in direction_deltas.items():
+        # Each line is its first position followed by the line from the next position
+        table = [()] * (33 * 33)
+        for y in (range(32, -1, -1) if dy > 0 else range(33)):
+            for x in (range(32, -1, -1) if dx > 0 else range(33)):
+                nx, ny = x + dx, y + dy
+                rest = table[ny * 33 + nx] if 0 <= nx < 33 and 0 <= ny < 33 else ()
+                table[y * 33 + x] = (y * 33 + x,) + rest
+        lines[direction] = table
+    return lines
+# Grid indices from every position up to the edge of the grid, as _LINES[direction][y * 33 + x]
+_LINES = _lines_table()
+_HEX_STATES = frozenset((GRID_BLACK, GRID_BLUE))  # `occ` values of HexCells
+
+
 class GeneratedLevel:
     """Internal representation of a generated level"""
+    __slots__ = ('grid', 'occ', 'column_hints', 'info_clue_cells', 'title', 'author')
+
     def __init__(self):
-        self.grid = [[None for _ in range(33)] for _ in range(33)]
+        self.grid = [None] * (33 * 33)  # row-major, position (x, y) at y * 33 + x
+        self.occ = bytearray(33 * 33)  # kernels.GRID_* value of each grid position, kept in step by `put`
         self.column_hints = []
+        self.info_clue_cells = {}  # HexCells whose info_type isn't '.', used as an ordered set
         self.title = "Generated Level"
         self.author = "Generator"
 
-    def get_neighbors(self, x, y) -> List[Tuple[int, int]]:
-        """Get hexagonal neighbors of a cell using the game's coordinate system"""
-        # These are the 6 immediate neighbors in the game's hex layout
-        # From common.py: _neighbors_deltas = [(0, -2), (1, -1), (1, 1), (0, 2), (-1, 1), (-1, -1)]
-        offsets = [(0, -2), (1, -1), (1, 1), (0, 2), (-1, 1), (-1, -1)]
-
-        neighbors = []
-        for dx, dy in offsets:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < 33 and 0 <= ny < 33:
-                neighbors.append((nx, ny))
-        return neighbors
-
-    def are_neighbors(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> bool:
-        """Check if two positions are neighbors"""
-        return pos2 in self.get_neighbors(pos1[0], pos1[1])
-
-    def all_grouped(self, positions: set) -> bool:
-        """Check if all positions form one connected group"""
-        if not positions:
-            return True
-
-        # Start with one position
-        grouped = {next(iter(positions))}
-        anything_to_add = True
-
-        while anything_to_add:
-            anything_to_add = False
-            for pos in positions - grouped:
-                if any(self.are_neighbors(pos, grouped_pos) for grouped_pos in grouped):
-                    anything_to_add = True
-                    grouped.add(pos)
-
-        return len(grouped) == len(positions)
+    def put(self, x, y, item):
+        """Place a HexCell, a ColumnHint or None at a position of the grid"""
+        i = y * 33 + x
+        self.grid[i] = item
+        self.occ[i] = (GRID_EMPTY if item is None else
+                       GRID_HINT if not item._is_hex else
+                       GRID_BLUE if item.is_blue else GRID_BLACK)
 
     def get_line_cells(self, x, y, direction) -> List[Tuple[int, int]]:
         """Get all cells in a line from a given position and direction
@@ -268,32 +396,54 @@ class GeneratedLevel:
         Returns positions of all non-None cells (both HexCells and ColumnHints).
         This is needed for check_consecutive to properly calculate indices.
         """
-        cells = []
-
-        delta = direction_deltas.get(direction)
-        if not delta:
+        lines = _LINES.get(direction)
+        if not lines:
             print("Invalid direction:", direction)
-            return cells
-
-        dx, dy = delta
+            return []
 
-        cx, cy = x, y
-
-        # Move forward collecting all non-None cells
-        while 0 <= cx < 33 and 0 <= cy < 33:
-            if self.grid[cy][cx]:
-                cells.append((cx, cy))
-            cx += dx
-            cy += dy
-
-        return cells
+        occ = self.occ
+        return [(i % 33, i // 33) for i in lines[y * 33 + x] if occ[i]]
 
     def get_hex_cells_in_line(self, x, y, direction) -> List[Tuple[int, int]]:
         """Get only HexCell positions in a line (filters out ColumnHints)"""
-        line_cells = self.get_line_cells(x, y, direction)
-        return [(cx, cy) for cx, cy in line_cells
-                if isinstance(self.grid[cy][cx], HexCell)]
+        lines = _LINES.get(direction)
+        if not lines:
+            print("Invalid direction:", direction)
+            return []
+
+        occ = self.occ
+        return [(i % 33, i // 33) for i in lines[y * 33 + x] if occ[i] in _HEX_STATES]
     
+    def solver_arrays(self, clues):
+        """Build the solver kernel arrays for this level, with constraint i standing for clues[i]
+
+        Returns (kind, display, con_owner, con_bits, con_value), see kernels.prune_clues.
+        """
+        occ = self.state_grid().ravel()
+        positions = np.flatnonzero((occ == GRID_BLACK) | (occ == GRID_BLUE))
+        # Number of the cell at each grid position, -1 where there is none
+        index = np.full(len(occ), -1, np.int32)
+        index[positions] = np.arange(len(positions))
+        kind = np.where(occ[positions] == GRID_BLUE, FULL, EMPTY).astype(np.int8)
+        revealed = np.array([self.grid[i].revealed for i in positions], bool)
+        display = np.where(revealed, kind, UNKNOWN).astype(np.int8)
+
+        con_owner = np.full(len(clues), -1, np.int32)
+        con_members = np.full((len(clues), len(common._flower_deltas)), -1, np.int32)
+        for i, clue in enumerate(clues):
+            if clue[0] == 'column':
+                hint = self.column_hints[clue[1]]
+                members = [index[cy * 33 + cx] for cx, cy in self.get_hex_cells_in_line(hint.x, hint.y, hint.direction)]
+            else:
+                _, x, y = clue
+                deltas = common._flower_deltas if occ[y * 33 + x] == GRID_BLUE else common._neighbors_deltas
+                members = [index[(y + dy) * 33 + x + dx] for dx, dy in deltas
+                           if 0 <= x + dx < 33 and 0 <= y + dy < 33 and index[(y + dy) * 33 + x + dx] >= 0]
+                con_owner[i] = index[y * 33 + x]
+            con_members[i, :len(members)] = members
+        con_value = np.array([np.count_nonzero(kind[row[row >= 0]]) for row in con_members], np.int32)
+        return kind, display, con_owner, member_bits(con_members, len(positions)), con_value
+
     def to_level_string(self) -> str:
         """Convert to Hexcells level format"""
         lines = [
@@ -305,37 +455,44 @@ class GeneratedLevel:
         ]
         # Build 33x33 grid
         for y in range(33):
-            row = ""
-            for x in range(33):
-                cell = self.grid[y][x]
-                if cell:
-                    row += cell.to_string()
-                else:
-                    row += ".."
-            lines.append(row)
+            lines.append(''.join(cell.to_string() if cell else '..' for cell in self.grid[y * 33:(y + 1) * 33]))
         return "\n".join(lines)
 
+    def populate_scene(self, scene):
+        """Add this level's cells and columns to a scene, as common.load would from to_level_string"""
+        scene.title = self.title
+        scene.author = self.author
+        scene.information = ''
+        for item in self.grid:
+            if item is None:
+                continue
+            if item._is_hex:
+                it = Cell()
+                it.kind = Cell.full if item.is_blue else Cell.empty
+                it.revealed = item.revealed
+                it.show_info = 0 if item.info_type == '.' else 1 if item.info_type == '+' else 2
+            else:
+                it = Column()
+                it.angle = _COLUMN_ANGLES[item._dir_idx]
+                it.show_info = item.consecutive is not None
+            scene.addItem(it)
+            it.place((item.x, item.y))
+            scene.placed_items[item.x, item.y] = it
+        scene.full_upd()
+
+    def state_grid(self):
+        """Contents of the grid as a (33, 33) int8 array of kernels.GRID_* values, viewing `occ`"""
+        return np.frombuffer(self.occ, np.int8).reshape(33, 33)
+
     def set_black_cell_info_types(self):
         """Set info_type (c/n) for black cells based on their blue neighbors"""
-        for y in range(33):
-            for x in range(33):
-                cell = self.grid[y][x]
-                if not isinstance(cell, HexCell) or cell.is_blue or cell.info_type == '.':
-                    continue
-
-                # Get all blue neighbors
-                blue_neighbors = set()
-                for nx, ny in self.get_neighbors(x, y):
-                    neighbor = self.grid[ny][nx]
-                    if isinstance(neighbor, HexCell) and neighbor.is_blue:
-                        blue_neighbors.add((nx, ny))
-
-                # If there are multiple blue neighbors, check if they're consecutive
-                if len(blue_neighbors) > 1:
-                    if self.all_grouped(blue_neighbors):
-                        cell.info_type = 'c'
-                    else:
-                        cell.info_type = 'n'
+        candidates = np.zeros(33 * 33, bool)
+        candidates[[cell.y * 33 + cell.x for cell in self.info_clue_cells if not cell.is_blue]] = True
+        candidates = candidates.reshape(33, 33)
+        # If there are multiple blue neighbors, check if they're consecutive
+        grouping = black_cell_grouping(self.state_grid(), candidates)
+        for i in np.flatnonzero(grouping):
+            self.grid[i].info_type = 'c' if grouping.flat[i] == 1 else 'n'
 
 class LevelGenerator:
     """Main generator class"""
@@ -382,22 +539,53 @@ class LevelGenerator:
         self.blue_info_weight_none = blue_info_weight_none
         self.clue_removal_ratio = clue_removal_ratio
 
-    def generate(self, max_attempts=20) -> Optional[GeneratedLevel]:
-        """Generate a complete level with minimized clues"""
-        for attempt in range(max_attempts):
-            print(f"Generation attempt {attempt + 1}/{max_attempts}...")
-            level = self.create_pattern()
-
-            if self.is_solvable(level):
-                print("Pattern is solvable, minimizing clues...")
-                self.minimize_clues(level)
-                print(f"Generated level with {self.count_clues(level)} clues")
-                self._set_level_metadata(level)
-                return level
-            print("Pattern not solvable, retrying...")
-
-        print(f"Failed to generate solvable level after {max_attempts} attempts, returning None")
-        return None
+    def generate(self, max_attempts=20, workers=1) -> Optional[GeneratedLevel]:
+        """Generate a complete level with minimized clues
+
+        Args:
+            max_attempts: Number of patterns to try before giving up
+            workers: Number of processes trying patterns at the same time
+        """
+        if workers > 1:
+            level = self._find_solvable_pattern(max_attempts, workers)
+        else:
+            level = None
+            for attempt in range(max_attempts):
+                print(f"Generation attempt {attempt + 1}/{max_attempts}...")
+                level = self.create_pattern()
+                if self._quick_viable(level) and self.is_solvable(level):
+                    break
+                print("Pattern not solvable, retrying...")
+                level = None
+
+        if level is None:
+            print(f"Failed to generate solvable level after {max_attempts} attempts, returning None")
+            return None
+        print("Pattern is solvable, minimizing clues...")
+        self.minimize_clues(level, workers)
+        print(f"Generated level with {self.count_clues(level)} clues")
+        self._set_level_metadata(level)
+        return level
+
+    def _find_solvable_pattern(self, max_attempts, workers) -> Optional[GeneratedLevel]:
+        """Try up to `max_attempts` patterns in a pool of processes, return the first solvable one
+        in the order they were started"""
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            # Each attempt gets its own seed drawn from ours and the results are taken in this order,
+            # so a seeded run picks the same pattern however the attempts are scheduled
+            futures = [executor.submit(_attempt_pattern, self, random.getrandbits(64))
+                       for _ in range(max_attempts)]
+            for attempt, future in enumerate(futures):
+                print(f"Generation attempt {attempt + 1}/{max_attempts}...")
+                level = future.result()
+                if level is not None:
+                    return level
+                print("Pattern not solvable, retrying...")
+            return None
+        finally:
+            # Let the attempts already running finish, so they don't compete with clue minimization
+            executor.shutdown(cancel_futures=True)
 
     def _set_level_metadata(self, level: GeneratedLevel):
         """Set the level title and author based on generation parameters"""
@@ -450,38 +638,37 @@ class LevelGenerator:
         center_x, center_y = grid_width // 2, grid_height // 2
         radius = min(width, height) // 2
 
-        for tx in range(0, width, 2):
-            for ty in range(height):
-                x = tx + (-width // 2) + grid_width // 2
-                y = ty + (-height // 2) + grid_height // 2
-                # Offset every other row (hex staggering)
-                grid_x = x + (y % 2)
-                grid_y = y
-
-                dx = grid_x - center_x
-                dy = grid_y - center_y
-                dist = math.sqrt(dx * dx + dy * dy)
-
-                # Apply radius constraint if enabled
-                radius_check = (dist <= radius * 1.0) if self.constrain_by_radius else True
-
-                if radius_check and random.random() < self.cell_spawn_chance:
-                    is_blue = random.random() < self.blue_density
-                    info_type = '+'
-                    if is_blue:
-                        info_type = random.choices(['+', '.'],
-                                                  weights=[self.blue_info_weight_plus,
-                                                          self.blue_info_weight_none])[0]
-                    level.grid[grid_y][grid_x] = HexCell(grid_x, grid_y, is_blue, info_type=info_type)
-
-
-
+        # Draw all random decisions in bulk; seeded from `random` so random.seed() still reproduces levels
+        rng = np.random.default_rng(random.getrandbits(64))
+        tx, ty = np.meshgrid(np.arange(0, width, 2), np.arange(height), indexing='ij')
+        x = tx + (-width // 2) + grid_width // 2
+        y = ty + (-height // 2) + grid_height // 2
+        # Offset every other row (hex staggering)
+        grid_x = x + (y % 2)
+        grid_y = y
+
+        spawn = rng.random(tx.shape) < self.cell_spawn_chance
+        # Apply radius constraint if enabled
+        if self.constrain_by_radius:
+            spawn &= (grid_x - center_x) ** 2 + (grid_y - center_y) ** 2 <= radius * radius
+        blue = rng.random(tx.shape) < self.blue_density
+        total_weight = self.blue_info_weight_plus + self.blue_info_weight_none
+        blue_plus = rng.random(tx.shape) * total_weight < self.blue_info_weight_plus
+
+        for i, j in np.argwhere(spawn):
+            cx, cy = int(grid_x[i, j]), int(grid_y[i, j])
+            is_blue = bool(blue[i, j])
+            info_type = '+' if not is_blue or blue_plus[i, j] else '.'
+            cell = HexCell(cx, cy, is_blue, info_type=info_type)
+            level.put(cx, cy, cell)
+            if info_type != '.':
+                level.info_clue_cells[cell] = None
 
         # Reveal a few random non-blue cells
-        all_cells = [cell for row in level.grid for cell in row if cell is not None and not cell.is_blue]
-        num_to_reveal = max(1, len(all_cells) // self.reveal_density)
-        for cell in random.sample(all_cells, num_to_reveal):
-            cell.revealed = True
+        black = np.flatnonzero(level.state_grid().ravel() == GRID_BLACK)
+        num_to_reveal = max(1, len(black) // self.reveal_density)
+        for i in rng.choice(black, num_to_reveal, replace=False):
+            level.grid[i].revealed = True
 
 
 
@@ -508,12 +695,12 @@ class LevelGenerator:
 
             if not has_members:
                 # Remove hint from grid and mark for removal from list
-                level.grid[hint.y][hint.x] = None
+                level.put(hint.x, hint.y, None)
                 hints_to_remove.append(hint)
                 continue
 
             # Try to move hint into empty space in its direction
-            dx, dy = direction_deltas[hint.direction]
+            dx, dy = _DIR_DELTAS[hint._dir_idx]
 
             # Try moving the hint up to 3 times
             hint_removed = False
@@ -522,15 +709,16 @@ class LevelGenerator:
                 if not (0 <= new_x < 33 and 0 <= new_y < 33):
                     break
 
-                if level.grid[new_y][new_x] is None:
+                state = level.occ[new_y * 33 + new_x]
+                if state == GRID_EMPTY:
                     # Move the hint
-                    level.grid[hint.y][hint.x] = None
+                    level.put(hint.x, hint.y, None)
                     hint.x = new_x
                     hint.y = new_y
-                    level.grid[new_y][new_x] = hint
-                elif isinstance(level.grid[new_y][new_x], ColumnHint):
+                    level.put(new_x, new_y, hint)
+                elif state == GRID_HINT:
                     # Collision with another hint, remove this one
-                    level.grid[hint.y][hint.x] = None
+                    level.put(hint.x, hint.y, None)
                     hints_to_remove.append(hint)
                     hint_removed = True
                     break
@@ -541,17 +729,12 @@ class LevelGenerator:
             if hint_removed:
                 continue
 
-            # Recalculate blue cells and consecutive info
-            blue_cells = [(cx, cy) for cx, cy in hex_cells
-                         if level.grid[cy][cx].is_blue]
-
-            # Recalculate consecutive/non-consecutive
-            if len(blue_cells) <= 1:
-                # Single cell or no cells - no togetherness info needed
-                hint.consecutive = None
-            else:
-                # Check if blue cells are consecutive
-                hint.consecutive = self.check_consecutive(hex_cells, blue_cells, level)
+            # Recalculate blue cells and consecutive/non-consecutive
+            blue_mask = 0
+            for i, (cx, cy) in enumerate(hex_cells):
+                if level.occ[cy * 33 + cx] == GRID_BLUE:
+                    blue_mask |= 1 << i
+            hint.consecutive = self.check_consecutive(blue_mask)
 
         # Remove hints that fail checks above
         for hint in hints_to_remove:
@@ -560,8 +743,7 @@ class LevelGenerator:
 
     def add_column_hints(self, level: 'GeneratedLevel'):
         """Add column/line hints above each HexCell if there is space (up+left, up two spaces, up+right)."""
-        height = len(level.grid)
-        width = len(level.grid[0]) if height > 0 else 0
+        height = width = 33
         # Directions: (dx, dy, direction symbol)
         directions = [
             (-1, -1, '\\'),  # up+left
@@ -570,36 +752,27 @@ class LevelGenerator:
         ]
         for y in range(height):
             for x in range(width):
-                cell = level.grid[y][x]
-                if not (cell and isinstance(cell, HexCell)):
+                state = level.occ[y * 33 + x]
+                if state != GRID_BLACK and state != GRID_BLUE:
                     continue
                 if random.random() < self.column_hint_chance:
                     continue
                 for dx, dy, direction in directions:
                     hx, hy = x + dx, y + dy
                     if 0 <= hx < width and 0 <= hy < height:
-                        if level.grid[hy][hx] is None:
+                        if level.occ[hy * 33 + hx] == GRID_EMPTY:
                             hint = ColumnHint(hx, hy, direction, consecutive=None)
                             level.column_hints.append(hint)
-                            level.grid[hy][hx] = hint
+                            level.put(hx, hy, hint)
 
-    def check_consecutive(self, line_cells, blue_cells, level) -> Optional[str]:
-        """Check if blue cells in a line are consecutive"""
-        if not blue_cells:
-            return None
-        blue_indices = []
-        for i, (cx, cy) in enumerate(line_cells):
-            cell = level.grid[cy][cx]
-            if isinstance(cell, HexCell) and cell.is_blue:
-                blue_indices.append(i)
-        if not blue_indices:
+    def check_consecutive(self, blue_mask) -> Optional[str]:
+        """Check if blue cells in a line are consecutive, given a bitmask of their indices among the line's cells"""
+        if not blue_mask & (blue_mask - 1):
+            # Single cell or no cells - no togetherness info needed
             return None
-        # Check if consecutive
-        is_consecutive = all(blue_indices[i] + 1 == blue_indices[i + 1]
-                            for i in range(len(blue_indices) - 1))
-        if len(blue_indices) > 1:
-            return 'c' if is_consecutive else 'n'
-        return None
+        # Shifted down to bit 0, a single run of bits is one less than a power of two
+        run = blue_mask // (blue_mask & -blue_mask)
+        return 'c' if not run & (run + 1) else 'n'
 
     def remove_random_column_hint(self, level: 'GeneratedLevel'):
         """Remove random column hints and all their members from the grid"""
@@ -618,53 +791,141 @@ class LevelGenerator:
 
             # Remove all cells in the line from the grid
             for cx, cy in line_cells:
-                level.grid[cy][cx] = None
+                item = level.grid[cy * 33 + cx]
+                if item._is_hex:
+                    level.info_clue_cells.pop(item, None)
+                elif item is not hint:
+                    # Other hints sitting on the line go as well, none may be left only in column_hints
+                    level.column_hints.remove(item)
+                level.put(cx, cy, None)
 
             # Remove the hint itself from the grid
-            level.grid[hint.y][hint.x] = None
+            level.put(hint.x, hint.y, None)
 
             # Remove the hint from the column_hints list
             level.column_hints.remove(hint)
 
-    def minimize_clues(self, level: GeneratedLevel):
-        """Remove redundant clues while maintaining solvability"""
-        clues = []
-        # Collect column hints and flower hints
-        for i in enumerate(level.column_hints):
-            clues.append(('column', i[0]))
-        for y in range(33):
-            for x in range(33):
-                cell = level.grid[y][x]
-                if isinstance(cell, HexCell) and cell.info_type != '.':
-                    clues.append(('flower' if cell.is_blue else 'blackcell', x, y))
-
-        # Shuffle for random removal order
-        random.shuffle(clues)
-        clues = clues[:int(len(clues) * self.clue_removal_ratio)]  # limit number of clues to try removing
-        
-        # Try removing each clue
+    def minimize_clues(self, level: GeneratedLevel, workers=1):
+        """Remove redundant clues while maintaining solvability
+
+        Args:
+            level: The level to remove clues from
+            workers: Number of processes checking clues at the same time
+        """
+        # Collect column hints and flower hints.
+        # Column hints are referred to by index, so from here on removed ones are set to None, never deleted
+        clues = [('column', i) for i in range(len(level.column_hints))]
+        for cell in sorted(level.info_clue_cells, key=lambda cell: (cell.y, cell.x)):
+            clues.append(('flower' if cell.is_blue else 'blackcell', cell.x, cell.y))
+
+        kind, display, con_owner, con_bits, con_value = level.solver_arrays(clues)
+        # Loaded once and kept in step with `level`, instead of reloading it for every solver run
+        scene = self._make_scene(level)
+
+        # Random removal order, limited to the number of clues to try removing
+        count = min(int(len(clues) * self.clue_removal_ratio), len(clues))
+        order = np.array(random.sample(range(len(clues)), count), np.int32)
+
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            removed_count = self._remove_clues(level, scene, clues, order, kind, display,
+                                               con_owner, con_bits, con_value, executor, workers)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        print(f"Checked {len(order)}/{len(order)} clues, removed {removed_count} as redundant")
+
+    def _remove_clues(self, level, scene, clues, order, kind, display, con_owner, con_bits, con_value,
+                      executor, workers) -> int:
+        """Try removing each clue in `order`, see minimize_clues. Return how many were removed."""
+        # Rounds of the last successful solve, and clues removed since, see _resume_round
+        trace = []
+        stale = []
+
+        # Try removing each clue, with a progress line that's overwritten in a terminal
+        progress = sys.stdout.isatty()
         removed_count = 0
-        for clue in clues:
+        i = 0
+        while i < len(order):
+            if progress:
+                print(f"Checked {i}/{len(order)} clues, removed {removed_count}", end='\r', flush=True)
+            # Drop clues for as long as simple deductions alone keep the level solvable
+            stop = prune_clues(kind, display, con_owner, con_bits, con_value, order, i)
+            for c in order[i:stop]:
+                backup = self.remove_clue(level, clues[c])
+                self._apply_clue_mutation(scene, clues[c], backup)
+                stale.append(clues[c])
+            removed_count += stop - i
+            if stop == len(order):
+                break
+
+            if executor is not None:
+                # Check the next clues side by side, each against the level as it is now.
+                # Removing clues never makes a level solvable, so a clue found to be needed stays needed
+                # after the ones before it are removed, but one found removable has to be checked again.
+                batch = order[stop:stop + workers]
+                results = executor.map(_clue_removable, [self] * len(batch), [level] * len(batch),
+                                       [clues[c] for c in batch])
+                i = stop
+                removed = False
+                for c, removable in zip(batch, results):
+                    if removable:
+                        if removed:
+                            break
+                        backup = self.remove_clue(level, clues[c])
+                        self._apply_clue_mutation(scene, clues[c], backup)
+                        stale.append(clues[c])
+                        con_value[c] = -1
+                        removed_count += 1
+                        removed = True
+                    i += 1
+                continue
+
             # Temporarily remove
+            clue = clues[order[stop]]
             backup = self.remove_clue(level, clue)
+            self._apply_clue_mutation(scene, clue, backup)
 
             # Check if still solvable
-            if self.is_solvable(level):
+            solvable = self._quick_viable(level)
+            if solvable:
+                # Rounds before the removed clues could be used go the same way, start after them
+                resume = self._resume_round(scene, trace, stale + [clue])
+            if solvable and self._clue_unused(scene, trace, resume, clue):
+                stale.append(clue)
+            elif solvable:
+                scene.prepare()
+                if resume:
+                    scene.uncover(trace[resume])
+                rounds = []
+                solvable = scene.solve_complete(rounds)
+                if solvable:
+                    trace[resume:] = rounds
+                    stale = []
+            if solvable:
                 removed_count += 1
+                con_value[order[stop]] = -1
                 #print("+++ removal successful: ", clue)
             else:
                 # Restore clue
                 self.restore_clue(level, clue, backup)
+                if not self._apply_clue_mutation(scene, clue, backup, restore=True):
+                    # The new scene has no cell ids yet, so nothing recorded on the old one can be replayed
+                    scene = self._make_scene(level)
+                    trace = []
+                    stale = []
                 #print("--- removal failed, clue restored: ", clue)
-        print(f"Removed {removed_count} redundant clues")
+            i = stop + 1
+        return removed_count
     
     def remove_clue(self, level: GeneratedLevel, clue) -> any:
         """Temporarily remove a clue and return backup. For column hints, also remove from grid."""
         if clue[0] == 'flower' or clue[0] == 'blackcell':
             _, x, y = clue
-            cell = level.grid[y][x]
+            cell = level.grid[y * 33 + x]
             backup = cell.info_type
             cell.info_type = '.'
+            level.info_clue_cells.pop(cell, None)
             return backup
         elif clue[0] == 'column':
             _, idx = clue
@@ -672,7 +933,7 @@ class LevelGenerator:
                 backup = level.column_hints[idx]
                 if backup is not None:
                     # Remove from grid as well
-                    level.grid[backup.y][backup.x] = None
+                    level.put(backup.x, backup.y, None)
                 level.column_hints[idx] = None
                 return backup
         return None
@@ -683,43 +944,130 @@ class LevelGenerator:
             return
         if clue[0] == 'flower' or clue[0] == 'blackcell':
             _, x, y = clue
-            cell = level.grid[y][x]
+            cell = level.grid[y * 33 + x]
             cell.info_type = backup
+            if backup != '.':
+                level.info_clue_cells[cell] = None
         elif clue[0] == 'column':
             _, idx = clue
             if idx < len(level.column_hints):
                 level.column_hints[idx] = backup
                 if backup is not None:
                     # Restore to grid as well
-                    level.grid[backup.y][backup.x] = backup
+                    level.put(backup.x, backup.y, backup)
+
+    def _resume_round(self, scene, trace, clues) -> int:
+        """Index of a round in `trace` that went the same way without `clues`.
+
+        A cell's clue is only used once the cell is uncovered, so every round that
+        started with all of them covered can be replayed from its recorded display.
+        Column hints are always shown, so the solve has to start over for them.
+        """
+        resume = len(trace)
+        for clue in clues:
+            if not resume or clue[0] == 'column':
+                return 0
+            owner = scene.placed_items[clue[1], clue[2]].id
+            for k in range(min(resume, len(trace))):
+                if trace[k][owner] != UNKNOWN:
+                    resume = k
+                    break
+        return max(resume - 1, 0)
+
+    def _clue_unused(self, scene, trace, resume, clue) -> bool:
+        """Whether the solve in `trace` had no use for a cell's clue: every cell it counts
+        was known by round `resume`, while the clue itself was still covered."""
+        if not trace or clue[0] == 'column':
+            return False
+        display = trace[resume]
+        cell = scene.placed_items[clue[1], clue[2]]
+        members = scene._flower[cell.id] if cell.kind is Cell.full else scene._nbr[cell.id]
+        members = members[members >= 0]
+        return bool(display[cell.id] == UNKNOWN and np.all(display[members] != UNKNOWN))
+
+    def _apply_clue_mutation(self, scene, clue, backup, restore=False):
+        """Make the same change to a scene from `_make_scene` as remove_clue (or restore_clue) made to its level.
+        Return False if the scene can't follow, and has to be made again."""
+        if backup is None:
+            return True
+        if clue[0] == 'flower' or clue[0] == 'blackcell':
+            _, x, y = clue
+            cell = scene.placed_items[x, y]
+            cell.show_info = 0 if not restore else 1 if backup == '+' else 2
+            common.Cell.reset_cache(cell)
+        elif clue[0] == 'column':
+            col = scene.placed_items.get((backup.x, backup.y))
+            if col is None:
+                # The hint's line was removed from the level, so the scene never had it
+                return not restore
+            if restore:
+                scene.addItem(col)
+                col.place()
+            else:
+                col.remove()
+        return True
 
     def count_clues(self, level: GeneratedLevel) -> int:
         """Count total number of clues in level"""
-        count = 0
-        for y in range(33):
-            for x in range(33):
-                cell = level.grid[y][x]
-                if isinstance(cell, HexCell) and cell.info_type != '.':
-                    count += 1
+        count = len(level.info_clue_cells)
         count += sum(1 for h in level.column_hints if h is not None)
         return count
 
+    def _quick_viable(self, level: GeneratedLevel) -> bool:
+        """Cheap check for levels is_solvable would certainly reject.
+
+        Hidden cells that no clue could ever count are only settled by the total number
+        of blue cells, which works only if they're all the same color.
+        """
+        covered = set()
+        for cell in level.info_clue_cells:
+            deltas = common._flower_deltas if cell.is_blue else common._neighbors_deltas
+            covered.update((cell.x + dx, cell.y + dy) for dx, dy in deltas)
+        for hint in level.column_hints:
+            if hint is not None:
+                covered.update(level.get_hex_cells_in_line(hint.x, hint.y, hint.direction))
+        occ = level.state_grid().ravel()
+        loose = {occ[i] for i in np.flatnonzero((occ == GRID_BLACK) | (occ == GRID_BLUE))
+                 if (i % 33, i // 33) not in covered and not level.grid[i].revealed}
+        return len(loose) < 2
+
     def is_solvable(self, level: GeneratedLevel):
         """Check if a level is solvable using the same logic as solve_complete in player.py"""
-        try:
-            from solver import solve, solve_simple
-        except ImportError:
+        if solve is None:
             print("Warning: solver module not available, assuming solvable")
             return True
 
         # Create a scene from the generated level
-        scene = Scene()
-        level_string = level.to_level_string()
-        common.load(level_string, scene, Cell=Cell, Column=Column)
+        scene = self._make_scene(level)
         scene.prepare()
         result = scene.solve_complete()
         return result
 
+    def _make_scene(self, level: GeneratedLevel) -> Scene:
+        """Load a level into a headless scene"""
+        scene = Scene()
+        scene.headless = True
+        level.populate_scene(scene)
+        return scene
+
+
+def _attempt_pattern(generator, seed):
+    """Worker for LevelGenerator.generate: create a pattern, return it if it's solvable"""
+    random.seed(seed)
+    level = generator.create_pattern()
+    return level if generator._quick_viable(level) and generator.is_solvable(level) else None
+
+def _clue_removable(generator, level, clue):
+    """Worker for LevelGenerator.minimize_clues: check whether the level stays solvable without a clue"""
+    generator.remove_clue(level, clue)
+    return generator._quick_viable(level) and generator.is_solvable(level)
+
+def _generate_level(generator, seed):
+    """Worker for main: generate one complete level"""
+    random.seed(seed)
+    return generator.generate()
+
+
 def main():
     """Command-line interface for the generator"""
     import argparse
@@ -756,6 +1104,8 @@ def main():
                        help='Base name for generated files (default: generated)')
     parser.add_argument('--output-dir', type=str, default='generated_levels',
                        help='Output directory for generated levels (default: generated_levels)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Number of processes to generate with (default: 1)')
 
     args = parser.parse_args()
 
@@ -779,6 +1129,7 @@ def main():
     print(f"Clue removal ratio:     {args.clue_removal_ratio} (lower=easier)")
     print(f"Output directory:       {args.output_dir}")
     print(f"Base name:              {args.name}")
+    print(f"Workers:                {args.workers}")
     print("=" * 60)
 
     generator = LevelGenerator(
@@ -796,9 +1147,7 @@ def main():
         clue_removal_ratio=args.clue_removal_ratio
     )
 
-    for i in range(args.count):
-        print(f"\n=== Generating level {i+1}/{args.count} ===")
-        level = generator.generate()
+    def save(i, level):
         if level:
             filename = os.path.join(args.output_dir, f"{args.name}_{i+1}.hexcells")
             with open(filename, 'w', encoding='utf-8') as f:
@@ -807,10 +1156,25 @@ def main():
         else:
             print(f"Failed to generate level {i+1}")
 
+    if args.count > 1 and args.workers > 1:
+        # Levels are independent, generate one per process
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(_generate_level, generator, random.getrandbits(64)): i
+                       for i in range(args.count)}
+            for future in as_completed(futures):
+                i = futures[future]
+                print(f"\n=== Generated level {i+1}/{args.count} ===")
+                save(i, future.result())
+    else:
+        for i in range(args.count):
+            print(f"\n=== Generating level {i+1}/{args.count} ===")
+            save(i, generator.generate(workers=args.workers))
+
     print(f"\n{'=' * 60}")
     print(f"Generation complete! Levels saved to: {args.output_dir}")
     print(f"{'=' * 60}")
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,201 @@
+# Copyright (C) 2025 Alex PB <chozabu@gmail.com>
+#
+# This file is part of SixCells.
+"""
+Compiled integer kernels for the level generator's solver.
+
+The solver state is kept in flat NumPy arrays so the hot loops can run in
+Numba's nopython mode. If Numba is not installed, the same functions run as
+plain Python.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+# Cell states as stored in the `display` arrays
+EMPTY, FULL, UNKNOWN = 0, 1, 2
+
+# Argument types of the kernels, used for ahead-of-time compilation by build_solver_ext.py.
+# The JIT compiles the same specializations lazily on first call.
+SIGNATURES = {
+    'member_bits': 'u8[:, ::1](i4[:, ::1], i8)',
+    'propagate_simple': 'b1(i1[::1], i4[::1], u8[:, ::1], i4[::1])',
+    'prune_clues': 'i8(i1[::1], i1[::1], i4[::1], u8[:, ::1], i4[::1], i4[::1], i8)',
+    'black_cell_grouping': 'i1[:, ::1](i1[:, ::1], b1[:, ::1])',
+}
+
+# Sets of cells are stored as bitboards: cell i is bit i%64 of the word i//64
+_ONE = np.uint64(1)
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0f0f0f0f0f0f0f0f)
+_S1, _S2, _S4, _S8, _S16, _S32 = (np.uint64(s) for s in (1, 2, 4, 8, 16, 32))
+_LOW7 = np.uint64(0x7f)
+
+
+@njit(cache=True)
+def popcount(x):
+    """Number of set bits in a 64-bit word, counted within the word (SWAR)"""
+    x = x - ((x >> _S1) & _M1)
+    x = (x & _M2) + ((x >> _S2) & _M2)
+    x = (x + (x >> _S4)) & _M4
+    x = x + (x >> _S8)
+    x = x + (x >> _S16)
+    x = x + (x >> _S32)
+    return int(x & _LOW7)
+
+
+@njit(cache=True)
+def member_bits(con_members, count):
+    """Convert constraint member lists into bitboards over `count` cells; -1 entries are skipped"""
+    bits = np.zeros((con_members.shape[0], (count + 63) // 64), np.uint64)
+    for c in range(con_members.shape[0]):
+        for m in con_members[c]:
+            if m < 0:
+                continue
+            bits[c, m // 64] |= _ONE << np.uint64(m % 64)
+    return bits
+
+
+@njit(cache=True)
+def scan_constraints(full_bits, empty_bits, con_owner, con_bits, con_value, fill):
+    """Work out, for every constraint, which state its unknown members are forced into.
+
+    Each constraint has a bitboard of its member cells and the number of blue
+    cells among them (-1 if it gives no information). `con_owner` is the index
+    of the cell showing the constraint, or -1 for column hints.
+    Writes FULL, EMPTY, or UNKNOWN if nothing follows, into `fill`.
+    """
+    for c in range(con_bits.shape[0]):
+        fill[c] = UNKNOWN
+        value = con_value[c]
+        owner = con_owner[c]
+        if value < 0:
+            continue
+        if owner >= 0 and not (full_bits[owner // 64] | empty_bits[owner // 64]) & (_ONE << np.uint64(owner % 64)):
+            continue
+        total = full = empty = 0
+        for w in range(con_bits.shape[1]):
+            members = con_bits[c, w]
+            total += popcount(members)
+            full += popcount(members & full_bits[w])
+            empty += popcount(members & empty_bits[w])
+        if full + empty == total:
+            continue
+        # Fill up remaining fulls / remaining empties
+        if value == total - empty:
+            fill[c] = FULL
+        elif value == full:
+            fill[c] = EMPTY
+
+
+@njit(cache=True)
+def propagate_simple(display, con_owner, con_bits, con_value):
+    """Apply the `solve_simple` deductions until nothing changes, updating `display` in place.
+
+    See `scan_constraints` for the meaning of the constraint arrays.
+    Return whether any cell was uncovered.
+    """
+    words = con_bits.shape[1]
+    full_bits = np.zeros(words, np.uint64)
+    empty_bits = np.zeros(words, np.uint64)
+    for i in range(len(display)):
+        if display[i] == FULL:
+            full_bits[i // 64] |= _ONE << np.uint64(i % 64)
+        elif display[i] == EMPTY:
+            empty_bits[i // 64] |= _ONE << np.uint64(i % 64)
+
+    fill = np.empty(con_bits.shape[0], np.int8)
+    changed = False
+    progress = True
+    while progress:
+        progress = False
+        scan_constraints(full_bits, empty_bits, con_owner, con_bits, con_value, fill)
+        for c in range(con_bits.shape[0]):
+            if fill[c] == UNKNOWN:
+                continue
+            target = full_bits if fill[c] == FULL else empty_bits
+            for w in range(words):
+                target[w] |= con_bits[c, w] & ~(full_bits[w] | empty_bits[w])
+            progress = changed = True
+
+    if changed:
+        for i in range(len(display)):
+            if display[i] == UNKNOWN:
+                bit = _ONE << np.uint64(i % 64)
+                if full_bits[i // 64] & bit:
+                    display[i] = FULL
+                elif empty_bits[i // 64] & bit:
+                    display[i] = EMPTY
+    return changed
+
+
+# Contents of the generator's integer grid, see GeneratedLevel.state_grid
+GRID_EMPTY, GRID_BLACK, GRID_BLUE, GRID_HINT = 0, 1, 2, 3
+
+# Hexagonal neighbor offsets, as common._neighbors_deltas
+_NEIGHBOR_DX = np.array([0, 1, 1, 0, -1, -1])
+_NEIGHBOR_DY = np.array([-2, -1, 1, 2, 1, -1])
+
+
+@njit(cache=True)
+def black_cell_grouping(state, candidates):
+    """For every position marked in `candidates` with more than one blue neighbor in `state`,
+    work out whether those neighbors form one connected group.
+
+    Returns an int8 array shaped like `state`: 1 if they do, 2 if they don't, 0 otherwise.
+    """
+    height, width = state.shape
+    out = np.zeros_like(state)
+    for y in range(height):
+        for x in range(width):
+            if not candidates[y, x]:
+                continue
+            # Bit k is set if neighbor k is blue
+            mask = count = 0
+            for k in range(6):
+                nx, ny = x + _NEIGHBOR_DX[k], y + _NEIGHBOR_DY[k]
+                if 0 <= nx < width and 0 <= ny < height and state[ny, nx] == GRID_BLUE:
+                    mask |= 1 << k
+                    count += 1
+            if count <= 1:
+                continue
+
+            # The neighbors go around in a ring, each touching only the ones before and after it,
+            # so they're connected if the set bits form a single run around the ring
+            runs = 0
+            for k in range(6):
+                if mask >> k & 1 and not mask >> (k + 5) % 6 & 1:
+                    runs += 1
+            out[y, x] = 1 if runs <= 1 else 2
+    return out
+
+
+@njit(cache=True)
+def prune_clues(kind, initial, con_owner, con_bits, con_value, order, start):
+    """Try removing the constraints `order[start:]` one by one, keeping each removal
+    for which `propagate_simple` still uncovers every blue cell from the `initial` display.
+
+    Removed constraints get a value of -1 in `con_value`.
+    Stop at the first removal that simple deductions can't justify, leaving it in place,
+    and return its position in `order` so the caller can decide it with the full solver.
+    Return len(order) if all of them were removed.
+    """
+    display = np.empty_like(initial)
+    for i in range(start, len(order)):
+        c = order[i]
+        value = con_value[c]
+        con_value[c] = -1
+        display[:] = initial
+        propagate_simple(display, con_owner, con_bits, con_value)
+        for j in range(len(kind)):
+            if kind[j] == FULL and display[j] != FULL:
+                con_value[c] = value
+                return i
+    return len(order)
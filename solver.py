@@ -23,7 +23,7 @@ from __future__ import division, print_function
 
 import itertools
 
-from pulp import GLPK, LpProblem, LpMinimize, LpVariable, lpSum, value
+from pulp import GLPK, LpProblem, LpMinimize, LpVariable, LpSolverDefault, lpSum, value
 
 from common import *
 
@@ -44,6 +44,11 @@ def get_solver():
     # There may be no glpsol. Let PuLP try to find another solver.
     print("Couldn't find 'glpsol' solver; a default may be found")
     solver = None
+    if LpSolverDefault is not None:
+        # Without its log, which would otherwise be printed for every MILP
+        solver = LpSolverDefault.copy()
+        solver.msg = False
+    return solver
 
 
 def solve(scene):
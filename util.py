@@ -29,18 +29,18 @@ def minmax(*args, **kwargs):
 def all_grouped(items, key):
     """Are all the items in one group or not?
     `key` should be a function that says whether 2 items are connected."""
+    remaining = set(items)
     try:
-        grouped = {next(iter(items))}
-    except StopIteration:
+        queue = [remaining.pop()]
+    except KeyError:
         return True
-    anything_to_add = True
-    while anything_to_add:
-        anything_to_add = False
-        for a in items - grouped:
-            if any(key(a, b) for b in grouped):
-                anything_to_add = True
-                grouped.add(a)
-    return len(grouped) == len(items)
+    # Flood fill, checking each newly grouped item against the ones not reached yet
+    while queue and remaining:
+        b = queue.pop()
+        connected = [a for a in remaining if key(a, b)]
+        remaining.difference_update(connected)
+        queue.extend(connected)
+    return not remaining
 
 
 def distance(a, b, squared=False):